@@ -3,141 +3,170 @@ import os
 import boto3
 import logging
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
+# Prefer orjson for parsing message bodies when it is bundled with the deployment
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
 # Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Larger connection pool for the worker threads, adaptive retries for throttling
+boto_config = Config(
+    max_pool_connections=50,
+    tcp_keepalive=True,
+    retries={'max_attempts': 5, 'mode': 'adaptive'},
+    connect_timeout=2,
+    read_timeout=10
+)
+
+# Initialize boto3 clients (reused across warm invocations)
+s3_client = boto3.client('s3', config=boto_config)
+rekognition_client = boto3.client('rekognition', config=boto_config)
+
+# Upper bound on records processed concurrently (default SQS batch size)
+MAX_WORKERS = 10
+
+# Largest image Rekognition Custom Labels accepts as inline Bytes (4 MB)
+MAX_IMAGE_BYTES = 4 * 1024 * 1024
+
+# Constant part of the Nuxeo set-property params; only the value varies per record
+NUXEO_PARAMS_BASE = {
+    "xpath": "assetRecognition:landMark",
+    "save": "true"
+}
+
+# Shared Nuxeo session so keep-alive reuses the connection across records
+nuxeo_session = requests.Session()
+nuxeo_session.headers.update({
+    'Nuxeo-Transaction-Timeout': '3',
+    'X-NXproperties': '*',
+    'X-NXRepository': 'default',
+    'X-NXVoidOperation': 'false',
+    'content-type': 'application/json'
+})
+nuxeo_session.auth = (os.environ["Nuxeo_User"], os.environ["Nuxeo_Password"])
+
+# Resolved once per cold start
+NUXEO_URL = os.environ["Nuxeo_Endpoint"]
+MODEL_ARN = os.environ['rekognition_model_project_version_arn']
+
+def get_rekognition_image(bucket, image):
+    """Fetch the image over the warm S3 connection, falling back to S3Object if too large."""
+    # Ranged GET caps the download; ContentRange ("bytes 0-N/total") gives the full size
+    s3_object = s3_client.get_object(Bucket=bucket, Key=image, Range=f"bytes=0-{MAX_IMAGE_BYTES - 1}")
+    if int(s3_object['ContentRange'].rsplit('/', 1)[1]) <= MAX_IMAGE_BYTES:
+        return {'Bytes': s3_object['Body'].read()}
+
+    # Too large for inline Bytes; skip the download and let Rekognition read it from S3
+    s3_object['Body'].close()
+    return {
+        'S3Object': {
+            'Bucket': bucket,
+            'Name': image
+        }
+    }
+
+def process_record(msg):
+    """Tag a single SQS record; returns the result dict, or None if it failed."""
+    try:
+        msg_payload = json_loads(msg["body"])
+        logger.info(f"Message payload: {msg_payload}")
+
+        if "Records" not in msg_payload:
+            logger.error(f"Invalid message, reporting batch item failure: {msg_payload}")
+            return None
+
+        # Extract S3 and document details
+        record = msg_payload["Records"][0]
+        bucket = record["s3"]["bucket"]["name"]
+        image = record["s3"]["object"]["key"].replace("+", " ")
+        doc_uid = record["s3"]["documentUUID"]["uid"]
+
+        if not all([bucket, image, doc_uid]):
+            logger.error("Missing required fields in message, reporting batch item failure")
+            return None
+
+        logger.info(f"Processing: bucket={bucket}, image={image}, docUid={doc_uid}")
+
+        # Fetch the image from S3
+        try:
+            rekognition_image = get_rekognition_image(bucket, image)
+        except ClientError as e:
+            logger.error(f"S3 error: {e}, reporting batch item failure")
+            return None
+
+        # Call Rekognition to detect custom labels
+        response = rekognition_client.detect_custom_labels(
+            ProjectVersionArn=MODEL_ARN,
+            Image=rekognition_image
+        )
+
+        # Get the custom labels
+        labels = response['CustomLabels']
+        logger.debug("Detected labels: %s", labels)
+
+        # Prepare labels for Nuxeo
+        label_names = [label['Name'] for label in labels]
+        labels_value = ",".join(label_names) if label_names else "none"
+
+        # Prepare Nuxeo API request
+        nuxeo_payload = {
+            "params": {**NUXEO_PARAMS_BASE, "value": labels_value},
+            "input": doc_uid,
+            "context": {}
+        }
+
+        # Make Nuxeo API call to set property
+        nuxeo_response = nuxeo_session.post(
+            NUXEO_URL,
+            json=nuxeo_payload,
+            timeout=5
+        )
+        nuxeo_response.raise_for_status()
+        logger.info(f"Nuxeo API response: {nuxeo_response.status_code}")
+
+        return {
+            'docUid': doc_uid,
+            'labels': label_names,
+            'nuxeo_status': nuxeo_response.status_code
+        }
+
+    except ClientError as e:
+        logger.error(f"Rekognition error: {e}, reporting batch item failure")
+    except json.JSONDecodeError as e:
+        logger.error(f"Invalid JSON in message: {e}, reporting batch item failure")
+    except requests.RequestException as e:
+        logger.error(f"Nuxeo API error: {e}, reporting batch item failure")
+    except Exception as e:
+        logger.error(f"Unexpected error: {e}, reporting batch item failure")
+    return None
 
 def lambda_handler(event, context):
-    # Nuxeo API endpoint and credentials
-    nuxeo_url = os.environ.get("Nuxeo_Endpoint")
-    nuxeo_user = os.environ.get("Nuxeo_User")
-    nuxeo_password = os.environ.get("Nuxeo_Password")  # Ensure this is set in environment variables
-    dlq_url = os.environ.get("DLQ_URL")  # Dead Letter Queue URL
-
-    if not dlq_url:
-        logger.error("DLQ_URL environment variable not set")
-        return {'status': '500', 'error': 'DLQ_URL not configured'}
-
-    # Create boto3 clients
-    s3_client = boto3.client('s3')
-    rekognition_client = boto3.client('rekognition')
-    sqs_client = boto3.client('sqs')
-    model_arn = os.environ['rekognition_model_project_version_arn']
-
     processed_messages = []
     failed_messages = []
 
-    for msg in event["Records"]:
-        try:
-            msg_payload = json.loads(msg["body"])
-            logger.info(f"Message payload: {msg_payload}")
-
-            if "Records" not in msg_payload:
-                logger.error(f"Invalid message, sending to DLQ: {msg_payload}")
-                failed_messages.append(msg)
-                continue
-
-            # Extract S3 and document details
-            record = msg_payload["Records"][0]
-            bucket = record["s3"]["bucket"]["name"]
-            image = record["s3"]["object"]["key"].replace("+", " ")
-            doc_uid = record["s3"]["documentUUID"]["uid"]
-
-            if not all([bucket, image, doc_uid]):
-                logger.error("Missing required fields in message, sending to DLQ")
-                failed_messages.append(msg)
-                continue
-
-            logger.info(f"Processing: bucket={bucket}, image={image}, docUid={doc_uid}")
-
-            # Call Rekognition to detect custom labels
-            response = rekognition_client.detect_custom_labels(
-                ProjectVersionArn=model_arn,
-                Image={
-                    'S3Object': {
-                        'Bucket': bucket,
-                        'Name': image
-                    }
-                }
-            )
-
-            # Get the custom labels
-            labels = response['CustomLabels']
-            logger.info(f"Detected labels: {labels}")
-
-            # Prepare labels for Nuxeo
-            label_names = [label['Name'] for label in labels]
-            labels_value = ",".join(label_names) if label_names else "none"
-
-            # Prepare Nuxeo API request
-            nuxeo_payload = {
-                "params": {
-                    "xpath": "assetRecognition:landMark",
-                    "save": "true",
-                    "value": labels_value
-                },
-                "input": doc_uid,
-                "context": {}
-            }
-
-            headers = {
-                'Nuxeo-Transaction-Timeout': '3',
-                'X-NXproperties': '*',
-                'X-NXRepository': 'default',
-                'X-NXVoidOperation': 'false',
-                'content-type': 'application/json'
-            }
-
-            # Make Nuxeo API call to set property
-            nuxeo_response = requests.post(
-                nuxeo_url,
-                json=nuxeo_payload,
-                headers=headers,
-                auth=(nuxeo_user, nuxeo_password),
-                timeout=5
-            )
-            nuxeo_response.raise_for_status()
-            logger.info(f"Nuxeo API response: {nuxeo_response.status_code}")
-
-            processed_messages.append({
-                'docUid': doc_uid,
-                'labels': label_names,
-                'nuxeo_status': nuxeo_response.status_code
-            })
+    # Records are independent, so run Rekognition + Nuxeo calls concurrently
+    records = event["Records"]
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_WORKERS, len(records)))) as executor:
+        results = list(executor.map(process_record, records))
 
-        except ClientError as e:
-            logger.error(f"Rekognition error: {e}, sending to DLQ")
-            failed_messages.append(msg)
-            continue
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON in message: {e}, sending to DLQ")
-            failed_messages.append(msg)
-            continue
-        except requests.RequestException as e:
-            logger.error(f"Nuxeo API error: {e}, sending to DLQ")
-            failed_messages.append(msg)
-            continue
-        except Exception as e:
-            logger.error(f"Unexpected error: {e}, sending to DLQ")
-            failed_messages.append(msg)
-            continue
-
-    # Send failed messages to DLQ
-    for failed_msg in failed_messages:
-        try:
-            sqs_client.send_message(
-                QueueUrl=dlq_url,
-                MessageBody=failed_msg['body']
-            )
-            logger.info(f"Sent message to DLQ: {failed_msg['messageId']}")
-        except ClientError as e:
-            logger.error(f"Failed to send message to DLQ: {e}")
+    for msg, result in zip(records, results):
+        if result is None:
+            failed_messages.append(msg['messageId'])
+        else:
+            processed_messages.append(result)
+
+    # Failed records are retried and eventually redriven to the DLQ by the
+    # event-source mapping (requires ReportBatchItemFailures to be enabled)
+    logger.info(f"Processed: {len(processed_messages)}, failed: {len(failed_messages)}")
 
     return {
-        'status': '200',
-        'processed': len(processed_messages),
-        'failed': len(failed_messages),
-        'results': processed_messages
-    }
\ No newline at end of file
+        'batchItemFailures': [{'itemIdentifier': msg_id} for msg_id in failed_messages]
+    }
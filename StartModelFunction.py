@@ -1,21 +1,24 @@
 import boto3
 import os
 import logging
+from botocore.config import Config
 
 # Set up logger for AWS Lambda (CloudWatch)
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-def get_rekognition_client():
-    logger.info("Initializing Rekognition client.")
-    return boto3.client('rekognition')
+# Keep idle connections alive between warm invocations
+boto_config = Config(
+    tcp_keepalive=True,
+    retries={'max_attempts': 5, 'mode': 'adaptive'}
+)
 
-def get_environment_variables():
-    logger.info("Fetching environment variables.")
-    return {
-        "project_version_arn": os.environ['rekog_model_project_version_arn'],
-        "project_arn": os.environ['rekog_model_project_arn']
-    }
+# Initialize Rekognition client
+rekog_client = boto3.client('rekognition', config=boto_config)
+
+# Resolved once per cold start
+PROJECT_VERSION_ARN = os.environ['rekog_model_project_version_arn']
+PROJECT_ARN = os.environ['rekog_model_project_arn']
 
 def get_project_version_name(project_version_arn):
     logger.info(f"Extracting project version name from ARN: {project_version_arn}")
@@ -50,13 +53,11 @@ def start_project_version(rekog_client, project_version_arn):
 
 def lambda_handler(event, context):
     logger.info("Lambda handler invoked.")
-    rekog_client = get_rekognition_client()
-    env_vars = get_environment_variables()
-    project_version_name = get_project_version_name(env_vars["project_version_arn"])
+    project_version_name = get_project_version_name(PROJECT_VERSION_ARN)
 
     logger.info("Checking project version status.")
     running_status = describe_project_version(
-        rekog_client, env_vars["project_arn"], project_version_name
+        rekog_client, PROJECT_ARN, project_version_name
     )
 
     if running_status in ['RUNNING', 'STARTING']:
@@ -64,4 +65,4 @@ def lambda_handler(event, context):
         return running_status
 
     logger.info("Project version is not running. Attempting to start.")
-    return start_project_version(rekog_client, env_vars["project_version_arn"])
\ No newline at end of file
+    return start_project_version(rekog_client, PROJECT_VERSION_ARN)
\ No newline at end of file
@@ -3,14 +3,36 @@ import boto3
 import os
 import requests
 import logging
+import time
+from botocore.config import Config
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-def get_rekognition_client():
-    """Initialize and return the Rekognition client."""
-    return boto3.client('rekognition')
+# Keep idle connections alive between warm invocations
+boto_config = Config(
+    tcp_keepalive=True,
+    retries={'max_attempts': 5, 'mode': 'adaptive'}
+)
+
+# Initialize Rekognition client
+rekog_client = boto3.client('rekognition', config=boto_config)
+
+# Last known model status, reused by warm invocations within STATUS_CACHE_TTL seconds
+STATUS_CACHE_TTL = 30
+STOPPED_STATES = ['STOPPED']
+status_cache = {"status": None, "ts": 0.0}
+
+# Shared Nuxeo session, reused across warm invocations
+nuxeo_session = requests.Session()
+nuxeo_session.headers.update({
+    "Nuxeo-Transaction-Timeout": "3",
+    "X-NXproperties": "*",
+    "X-NXRepository": "default",
+    "X-NXVoidOperation": "false",
+    "content-type": "application/json"
+})
 
 def get_environment_variable(key, required=True):
     """Fetch an environment variable, raising an error if required and not set."""
@@ -26,14 +48,26 @@ def get_environment_variables():
         return {
             "project_version_arn": get_environment_variable('rekog_model_project_version_arn'),
             "project_arn": get_environment_variable('rekog_model_project_arn'),
-            "nuxeo_endpoint": get_environment_variable("Nuxeo_Endpoint"),
-            "nuxeo_username": get_environment_variable("Nuxeo_UserName"),
-            "nuxeo_password": get_environment_variable("Nuxeo_Password")
+            "nuxeo_endpoint": get_environment_variable("Nuxeo_Endpoint")
         }
     except EnvironmentError as e:
         logger.error(f"Environment variable error: {e}")
         raise
 
+# Resolved once per cold start; a missing variable fails the import
+ENV_VARS = get_environment_variables()
+nuxeo_session.auth = (get_environment_variable("Nuxeo_UserName"), get_environment_variable("Nuxeo_Password"))
+
+def update_status_cache(status):
+    """Record the latest known model status."""
+    status_cache["status"] = status
+    status_cache["ts"] = time.monotonic()
+
+def is_recently_stopped():
+    """Check whether the model was seen stopped within the cache TTL."""
+    return (status_cache["status"] in STOPPED_STATES
+            and time.monotonic() - status_cache["ts"] < STATUS_CACHE_TTL)
+
 def check_model_running_status(rekog_client, project_arn, project_version_name):
     """Check the running status of the Rekognition model."""
     try:
@@ -41,7 +75,9 @@ def check_model_running_status(rekog_client, project_arn, project_version_name):
             ProjectArn=project_arn,
             VersionNames=[project_version_name]
         )
-        return response['ProjectVersionDescriptions'][0]['Status']
+        status = response['ProjectVersionDescriptions'][0]['Status']
+        update_status_cache(status)
+        return status
     except Exception as e:
         logger.error(f"Error checking model status: {e}")
         return None
@@ -50,7 +86,8 @@ def stop_model_if_running(rekog_client, project_version_arn, running_status, run
     """Stop the Rekognition model if it is in a running state."""
     if running_status in running_states:
         try:
-            rekog_client.stop_project_version(ProjectVersionArn=project_version_arn)
+            response = rekog_client.stop_project_version(ProjectVersionArn=project_version_arn)
+            update_status_cache(response.get('Status', 'STOPPING'))
             logger.info(f"Model stopped successfully. Status: {running_status}")
         except Exception as e:
             logger.error(f"Error stopping model: {e}")
@@ -67,14 +104,6 @@ def send_nuxeo_request(event, env_vars):
             "body": json.dumps({"error": "User email is required to send Nuxeo request."})
         }
 
-    headers = {
-        "Nuxeo-Transaction-Timeout": "3",
-        "X-NXproperties": "*",
-        "X-NXRepository": "default",
-        "X-NXVoidOperation": "false",
-        "content-type": "application/json"
-    }
-
     payload = {
         "params": {"from": "no-reply@maildrop.cc", "to": user_email, "HTML": True},
         "input": event.get('collectionId'),
@@ -82,11 +111,9 @@ def send_nuxeo_request(event, env_vars):
     }
 
     try:
-        response = requests.post(
+        response = nuxeo_session.post(
             env_vars["nuxeo_endpoint"],
-            headers=headers,
             json=payload,
-            auth=(env_vars["nuxeo_username"], env_vars["nuxeo_password"]),
             timeout=5
         )
         logger.info(f"Nuxeo response status: {response.status_code}")
@@ -110,24 +137,19 @@ def send_nuxeo_request(event, env_vars):
 def lambda_handler(event, context):
     """Main Lambda function handler."""
     try:
-        env_vars = get_environment_variables()
-        rekog_client = get_rekognition_client()
         running_states = ['STARTING', 'RUNNING']
-        project_version_name = env_vars["project_version_arn"].split("/")[3]
+        project_version_name = ENV_VARS["project_version_arn"].split("/")[3]
 
-        running_status = check_model_running_status(
-            rekog_client, env_vars["project_arn"], project_version_name
-        )
-        if running_status:
-            stop_model_if_running(rekog_client, env_vars["project_version_arn"], running_status, running_states)
+        if is_recently_stopped():
+            logger.info(f"Model recently seen as {status_cache['status']}. Skipping status check.")
+        else:
+            running_status = check_model_running_status(
+                rekog_client, ENV_VARS["project_arn"], project_version_name
+            )
+            if running_status:
+                stop_model_if_running(rekog_client, ENV_VARS["project_version_arn"], running_status, running_states)
 
-        return send_nuxeo_request(event, env_vars)
-    except EnvironmentError as e:
-        logger.error(f"Environment error: {e}")
-        return {
-            "statusCode": 500,
-            "body": json.dumps({"error": str(e)})
-        }
+        return send_nuxeo_request(event, ENV_VARS)
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
         return {
@@ -3,13 +3,55 @@ import os
 import logging
 import requests
 import boto3
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
+
+# Prefer orjson for serializing message bodies when it is bundled with the deployment
+try:
+    import orjson
+
+    def json_dumps(obj):
+        return orjson.dumps(obj).decode()
+except ImportError:
+    json_dumps = json.dumps
 
 # Configure logging for CloudWatch
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Larger connection pool and adaptive retries for SQS throttling
+boto_config = Config(
+    max_pool_connections=50,
+    tcp_keepalive=True,
+    retries={"max_attempts": 5, "mode": "adaptive"},
+    connect_timeout=2,
+    read_timeout=10
+)
 
 # Initialize SQS client
-sqs = boto3.client("sqs")
+sqs = boto3.client("sqs", config=boto_config)
+
+# Maximum entries allowed in a single SQS send_message_batch call
+SQS_BATCH_SIZE = 10
+
+# Number of send_message_batch calls in flight at once
+MAX_WORKERS = 8
+
+# Source bucket referenced by every SQS message
+SOURCE_BUCKET = {
+    "name": "******",
+    "arn": "******"
+}
+
+# Shared Nuxeo session, reused across warm invocations
+nuxeo_session = requests.Session()
+nuxeo_session.headers.update({
+    "Nuxeo-Transaction-Timeout": "3",
+    "X-NXproperties": "*",
+    "X-NXRepository": "default",
+    "X-NXVoidOperation": "false",
+    "content-type": "application/json"
+})
 
 
 def get_environment_variable(key, required=True):
@@ -20,13 +62,17 @@ def get_environment_variable(key, required=True):
     return value
 
 
-def make_nuxeo_request(url, headers, payload, auth):
+# Resolved once per cold start; a missing variable fails the import
+NUXEO_URL = get_environment_variable("Nuxeo_Endpoint")
+QUEUE_URL = get_environment_variable("SQS_QUEUE_URL")
+nuxeo_session.auth = (get_environment_variable("Nuxeo_UserName"), get_environment_variable("Nuxeo_Password"))
+
+
+def make_nuxeo_request(url, payload):
     try:
-        response = requests.post(
+        response = nuxeo_session.post(
             url,
-            headers=headers,
             json=payload,
-            auth=auth,
             timeout=5
         )
         response.raise_for_status()
@@ -36,16 +82,52 @@ def make_nuxeo_request(url, headers, payload, auth):
         raise
 
 
+def send_message_batch(batch, queue_url):
+    try:
+        response = sqs.send_message_batch(
+            QueueUrl=queue_url,
+            Entries=[
+                {"Id": str(i), "MessageBody": message_body}
+                for i, (_, _, message_body) in enumerate(batch)
+            ]
+        )
+    except Exception as e:
+        for document_uuid, binary_key, _ in batch:
+            logger.error(f"Failed to send message for document {document_uuid} {binary_key}: {str(e)}")
+        return
+
+    for entry in response.get("Successful", []):
+        document_uuid, binary_key, _ = batch[int(entry["Id"])]
+        logger.info(f"Message sent to SQS for document {document_uuid} {binary_key}")
+    for entry in response.get("Failed", []):
+        document_uuid, binary_key, _ = batch[int(entry["Id"])]
+        logger.error(f"Failed to send message for document {document_uuid} {binary_key}: {entry.get('Message')}")
+
+
 def process_documents(documents, queue_url):
+    # Each full batch is dispatched to the pool while the next one is being built
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [
+            executor.submit(send_message_batch, batch, queue_url)
+            for batch in build_batches(documents)
+        ]
+        # Surface unexpected errors from the workers to the handler
+        for future in futures:
+            future.result()
+
+
+def build_batches(documents):
+    batch = []
     for document in documents:
-        if document.get("properties", {}).get("picture:views", []):
-            for view in document.get("properties", {}).get("picture:views", []):
-                if view.get("title") == "FullHD":
-                    digest = view.get("content", {}).get("digest", "unknown")
-                    break
-        else:
-            digest = document.get("properties", {}).get("file:content", {}).get("digest", "unknown")
-        
+        # Prefer the FullHD picture view, falling back to the main file content
+        properties = document.get("properties") or {}
+        views = properties.get("picture:views") or []
+        digest = next(
+            (view["content"]["digest"] for view in views
+             if view.get("title") == "FullHD" and (view.get("content") or {}).get("digest")),
+            None
+        ) or (properties.get("file:content") or {}).get("digest", "unknown")
+
         document_uuid = document.get("uid")
         if digest == "unknown":
             logger.warning(f"Digest not found for document {document_uuid}")
@@ -56,10 +138,7 @@ def process_documents(documents, queue_url):
             "Records": [
                 {
                     "s3": {
-                        "bucket": {
-                            "name": "******",
-                            "arn": "******"
-                        },
+                        "bucket": SOURCE_BUCKET,
                         "object": {
                             "key": binary_key
                         },
@@ -71,32 +150,18 @@ def process_documents(documents, queue_url):
             ]
         }
 
-        try:
-            sqs.send_message(
-                QueueUrl=queue_url,
-                MessageBody=json.dumps(sqs_payload)
-            )
-            logger.info(f"Message sent to SQS for document {document_uuid} {binary_key}")
-        except Exception as e:
-            logger.error(f"Failed to send message for document {document_uuid} {binary_key}: {str(e)}")
+        batch.append((document_uuid, binary_key, json_dumps(sqs_payload)))
+        if len(batch) == SQS_BATCH_SIZE:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
 
 
 def lambda_handler(event, context):
     try:
-        # Fetch environment variables
-        url = get_environment_variable("Nuxeo_Endpoint")
-        username = get_environment_variable("Nuxeo_UserName")
-        password = get_environment_variable("Nuxeo_Password")
-        queue_url = get_environment_variable("SQS_QUEUE_URL")
-
-        # Prepare headers and payload
-        headers = {
-            "Nuxeo-Transaction-Timeout": "3",
-            "X-NXproperties": "*",
-            "X-NXRepository": "default",
-            "X-NXVoidOperation": "false",
-            "content-type": "application/json"
-        }
+        # Prepare payload
         payload = {
             "params": {},
             "input": event["collectionId"],
@@ -104,7 +169,7 @@ def lambda_handler(event, context):
         }
 
         # Make Nuxeo API request
-        response_data = make_nuxeo_request(url, headers, payload, (username, password))
+        response_data = make_nuxeo_request(NUXEO_URL, payload)
         documents = response_data.get("entries", [])
 
         if not documents:
@@ -115,14 +180,14 @@ def lambda_handler(event, context):
             }
 
         # Process documents and send messages to SQS
-        process_documents(documents, queue_url)
+        process_documents(documents, QUEUE_URL)
 
         return {
             "statusCode": 200,
             "body": json.dumps({"message": "Messages sent to SQS successfully."})
         }
 
-    except EnvironmentError as e:
+    except requests.exceptions.RequestException as e:
         return {
             "statusCode": 500,
             "body": json.dumps({"error": str(e)})
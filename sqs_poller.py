@@ -1,25 +1,32 @@
 import boto3
 import os
 import logging
+from botocore.config import Config
 
 # Set up logger for AWS Lambda (CloudWatch)
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Keep idle connections alive between warm invocations
+boto_config = Config(
+    tcp_keepalive=True,
+    retries={'max_attempts': 5, 'mode': 'adaptive'}
+)
+
+# Initialize SQS client
+sqs = boto3.client('sqs', config=boto_config)
+
+# Resolved once per cold start
+SRC_QUEUE_URL = os.environ['SQS_Queue_URL']
+
 def lambda_handler(event, context):
-    # Create SQS client
-    sqs = boto3.client('sqs')
-    src_queue_url = os.environ['SQS_Queue_URL']
     # Check message available in Incoming Queue
     response = sqs.get_queue_attributes(
-         QueueUrl=src_queue_url,
+         QueueUrl=SRC_QUEUE_URL,
          AttributeNames=[
               'ApproximateNumberOfMessages'
               ]
          )
-    count = response['Attributes']['ApproximateNumberOfMessages'][0]
+    count = int(response['Attributes']['ApproximateNumberOfMessages'])
     logger.info('Message Count in Incoming Queue: %s', count)
-    if int(count) > 0:
-        return 'incoming'
-    else:
-        return 'stop'
\ No newline at end of file
+    return 'incoming' if count > 0 else 'stop'
\ No newline at end of file